@@ -5,6 +5,8 @@ import six
 class UnicodeMixin(object):
 
     """ Mixin that handles __str__ and __bytes__. Just define __unicode__.  """
+    __slots__ = ()
+
     if six.PY3:  # pragma: no cover
         def __str__(self):
             return self.__unicode__()
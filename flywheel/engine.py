@@ -8,6 +8,7 @@ from dynamo3 import (DynamoDBConnection, CheckFailed, ItemUpdate, ALL_NEW,
                      UPDATED_NEW)
 
 from .fields import Field
+from .model_meta import wait_for_active
 from .models import Model, SetDelta
 from .query import Query, Scan
 
@@ -208,11 +209,16 @@ class Engine(object):
         changed = []
         for model in six.itervalues(self.models):
             result = model.meta_.create_dynamo_schema(
-                self.dynamo, tablenames, test=test, wait=True,
+                self.dynamo, tablenames, test=test, wait=False,
                 throughput=throughput.get(model.meta_.ddb_tablename()),
                 namespace=self.namespace)
             if result:
                 changed.append(result)
+        # DynamoDB creates the tables concurrently, so only start waiting
+        # once all of them have been requested
+        if not test:
+            for tablename in changed:
+                wait_for_active(self.dynamo, tablename)
         return changed
 
     def update_schema(self, test=False, throughput=None):
@@ -9,7 +9,7 @@ from decimal import Decimal
 
 from .conditions import Condition
 from .indexes import GlobalIndex
-from .types import TypeDefinition, ALL_TYPES, set_
+from .types import TypeDefinition, ALL_TYPES, set_, get_type
 
 NO_ARG = object()
 
@@ -64,6 +64,9 @@ class Field(object):
         Field().all_index('my-index')
 
     """
+    __slots__ = ('name', 'model', 'composite', 'data_type', '_coerce', 'check',
+                 'hash_key', 'range_key', 'subfields', 'index', 'index_name',
+                 '_ddb_index', '_ddb_index_kwargs', '_default', 'overflow')
 
     def __init__(self, hash_key=False, range_key=False, index=None,
                  data_type=NO_ARG, type=six.text_type, coerce=False,
@@ -77,14 +80,22 @@ class Field(object):
             data_type = type
         if isinstance(data_type, TypeDefinition):
             self.data_type = data_type
-        elif (inspect.isclass(data_type) and
-              issubclass(data_type, TypeDefinition)):
-            self.data_type = data_type()
         else:
-            type_factory = ALL_TYPES.get(data_type)
-            if type_factory is None:
+            # Registered data types are by far the most common, so check for
+            # those before a custom class. Only the lookup is guarded, so
+            # errors from constructing a registered type still propagate.
+            try:
+                registered = data_type in ALL_TYPES
+            except TypeError:
+                # Unhashable values can't be registered data types
+                registered = False
+            if registered:
+                self.data_type = get_type(data_type)
+            elif (inspect.isclass(data_type) and
+                  issubclass(data_type, TypeDefinition)):
+                self.data_type = data_type()
+            else:
                 raise TypeError("Unrecognized data_type '%s'" % data_type)
-            self.data_type = type_factory()
         self._coerce = coerce
         self.check = []
         if check is not None:
@@ -100,7 +111,7 @@ class Field(object):
         self.index = False
         self.index_name = None
         self._ddb_index = None
-        self._ddb_index_kwargs = None
+        self._ddb_index_kwargs = {}
         if default is NO_ARG:
             if self.is_set:
                 self._default = set()
@@ -231,8 +242,9 @@ class Field(object):
         """ Dump a value to format for use in a Dynamo query """
         if value is None:
             return None
-        value = self.coerce(value, force_coerce=True)
-        return self.ddb_dump(value)
+        # coerce() never turns a real value into None, so skip the extra null
+        # check in ddb_dump() and go straight to the data type
+        return self.data_type.ddb_dump(self.coerce(value, force_coerce=True))
 
     def ddb_load(self, val):
         """ Decode a value retrieved from Dynamo """
@@ -348,10 +360,10 @@ class Field(object):
 
         """
         if 'in' not in self.data_type.allowed_filters:
-            raise TypeError("Cannot use '%s' filter on '%s' field" %
-                            (filter, self.data_type))
-        else:
-            other = set([self.ddb_dump_for_query(val) for val in other])
+            raise TypeError("Cannot use 'in' filter on '%s' field" %
+                            self.data_type)
+        dump = self.ddb_dump_for_query
+        other = {dump(val) for val in other}
         return Condition.construct(self.name, 'in', other)
 
     def beginswith_(self, other):
@@ -383,6 +395,11 @@ class Field(object):
         return self.between_(low, high)
 
 
+def _default_merge(*args):
+    """ Join the subfields of a Composite with ':' """
+    return ':'.join(args)
+
+
 class Composite(Field):
 
     """
@@ -413,11 +430,12 @@ class Composite(Field):
         joins them with a ':'.
 
     """
+    __slots__ = ('merge',)
 
     def __init__(self, *args, **kwargs):
         self.merge = kwargs.pop('merge', None)
         if self.merge is None:
-            self.merge = lambda *args: ':'.join(args)
+            self.merge = _default_merge
         unrecognized = (set(kwargs.keys()) -
                         set(['range_key', 'index', 'hash_key', 'data_type',
                              'check', 'coerce']))
@@ -432,15 +450,36 @@ class Composite(Field):
     def __contains__(self, key):
         return key in self.subfields
 
+    def __get__(self, obj, objtype=None):
+        # Accessed on the class, this is the field itself (used to build
+        # queries). On an instance, construct the composite value on the fly.
+        if obj is None:
+            return self
+        return self.resolve(obj)
+
+    def __set__(self, obj, value):
+        # Composite values are derived from their subfields, so setting one
+        # is ignored
+        pass
+
     def resolve(self, obj=None, scope=None):
         """ Resolve a field value from an object or scope dict """
         if scope is not None and self.name in scope:
             return super(Composite, self).resolve(obj, scope)
         args = [self.model.meta_.fields[f].resolve(obj, scope) for f in
                 self.subfields]
-        return self.coerce(self.merge(*args))
+        return self.coerce(self._merge(args))
+
+    def _merge(self, args):
+        """ Merge the subfield values with the current merge function """
+        merge = self.merge
+        # The default merge joins the list directly, which avoids the
+        # argument unpacking and an extra function frame
+        if merge is _default_merge:
+            return ':'.join(args)
+        return merge(*args)
 
     def get_cached_value(self, obj):
         args = [self.model.meta_.fields[f].get_cached_value(obj) for f in
                 self.subfields]
-        return self.coerce(self.merge(*args))
+        return self.coerce(self._merge(args))
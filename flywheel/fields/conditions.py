@@ -1,10 +1,32 @@
 """ Query constraints """
 import six
 from dynamo3 import Limit
+from six.moves import intern  # pylint: disable=F0401,W0622
 
 
 FILTER_ONLY = set(['contains', 'ncontains', 'null', 'in', 'ne'])
 
+# Cache of (field, operator) to dynamo3 keyword, e.g. 'name__eq'
+_FILTER_KEYS = {}
+# Fields are usually declared on a model, but scans may filter on arbitrary
+# names, so keep the cache from growing without bound
+_MAX_FILTER_KEYS = 1024
+
+
+def filter_key(field, op):
+    """ Get the interned dynamo3 keyword for filtering a field by an op """
+    try:
+        return _FILTER_KEYS[(field, op)]
+    except KeyError:
+        if len(_FILTER_KEYS) >= _MAX_FILTER_KEYS:
+            _FILTER_KEYS.clear()
+        key = '%s__%s' % (field, op)
+        # intern() only accepts native strings on python 2
+        if isinstance(key, str):
+            key = intern(key)
+        _FILTER_KEYS[(field, op)] = key
+        return key
+
 
 class Condition(object):
 
@@ -25,6 +47,7 @@ class Condition(object):
         Name of index to use for a query
 
     """
+    __slots__ = ('eq_fields', 'fields', 'limit', 'scan_limit', 'index_name')
 
     def __init__(self):
         self.eq_fields = {}
@@ -46,9 +69,9 @@ class Condition(object):
         """ Get the kwargs for doing a table scan """
         kwargs = {}
         for key, val in six.iteritems(self.eq_fields):
-            kwargs["%s__eq" % key] = val
+            kwargs[filter_key(key, 'eq')] = val
         for key, (op, val) in six.iteritems(self.fields):
-            kwargs["%s__%s" % (key, op)] = val
+            kwargs[filter_key(key, op)] = val
         self._add_limit(kwargs)
         return kwargs
 
@@ -57,10 +80,13 @@ class Condition(object):
         if self.index_name is not None:
             ordering = model.meta_.get_ordering_from_index(self.index_name)
         else:
-            queryable_keys = [k for k, (op, _) in six.iteritems(self.fields)
-                              if op not in FILTER_ONLY]
+            # Pass sets/dicts so the repeated membership checks during
+            # ordering resolution are O(1)
+            filter_only = FILTER_ONLY
+            queryable_keys = {k for k, (op, _) in six.iteritems(self.fields)
+                              if op not in filter_only}
             ordering = model.meta_.get_ordering_from_fields(
-                self.eq_fields.keys(),
+                self.eq_fields,
                 queryable_keys,
             )
 
@@ -93,15 +119,16 @@ class Condition(object):
 
         """
         c = cls()
-        if other is None:
+        # Equality on a real value is by far the most common case
+        if op == 'eq' and other is not None:
+            c.eq_fields[field] = other
+        elif other is None:
             if op == 'eq':
                 c.fields[field] = ('null', True)
             elif op == 'ne':
                 c.fields[field] = ('null', False)
             else:
                 raise ValueError("Cannot filter %s None" % op)
-        elif op == 'eq':
-            c.eq_fields[field] = other
         else:
             c.fields[field] = (op, other)
         return c
@@ -22,6 +22,9 @@ class GlobalIndex(object):
 
     """
 
+    __slots__ = ('name', 'hash_key', 'range_key', '_throughput', 'ddb_index',
+                 'kwargs', '_ddb_keys', '_ddb_keys_fields')
+
     def __init__(self, name, hash_key, range_key=None):
         self.name = name
         self.hash_key = hash_key
@@ -29,6 +32,8 @@ class GlobalIndex(object):
         self._throughput = Throughput()
         self.ddb_index = GIndex.all
         self.kwargs = {}
+        self._ddb_keys = None
+        self._ddb_keys_fields = None
 
     @classmethod
     def all(cls, name, hash_key, range_key=None):
@@ -53,12 +58,20 @@ class GlobalIndex(object):
 
     def get_ddb_index(self, fields):
         """ Get the dynamo index class for this GlobalIndex """
-        hash_key = DynamoKey(self.hash_key,
-                             data_type=fields[self.hash_key].ddb_data_type)
-        range_key = None
-        if self.range_key is not None:
-            range_key = DynamoKey(self.range_key,
-                                  data_type=fields[self.range_key].ddb_data_type)
+        # The keys only depend on the model fields, so build them once per
+        # fields mapping. The index itself is always new because callers
+        # override its throughput.
+        if self._ddb_keys_fields is not fields:
+            hash_key = DynamoKey(self.hash_key,
+                                 data_type=fields[self.hash_key].ddb_data_type)
+            range_key = None
+            if self.range_key is not None:
+                range_key = DynamoKey(
+                    self.range_key,
+                    data_type=fields[self.range_key].ddb_data_type)
+            self._ddb_keys = (hash_key, range_key)
+            self._ddb_keys_fields = fields
+        hash_key, range_key = self._ddb_keys
         index = self.ddb_index(self.name, hash_key, range_key,
                                throughput=self._throughput, **self.kwargs)
         return index
@@ -90,7 +103,7 @@ class GlobalIndex(object):
         return self
 
     def __contains__(self, field):
-        return field == self.hash_key or field == self.range_key
+        return field in (self.hash_key, self.range_key)
 
     def __iter__(self):
         yield self.hash_key
@@ -3,15 +3,60 @@ import calendar
 import datetime
 import functools
 import json
+import math
 import six
-from decimal import Decimal
+from decimal import Context, Decimal
 from dynamo3 import (Binary, NUMBER, STRING, BINARY, NUMBER_SET, STRING_SET,
                      BINARY_SET, BOOL, MAP, LIST)
 from dynamo3.types import float_to_decimal
 
 from flywheel.compat import UnicodeMixin
 
-ALL_TYPES = {}
+_ALL_TYPES = {}
+try:
+    from types import MappingProxyType
+    # Read-only view of the registered types. Use register_type() to add to it.
+    ALL_TYPES = MappingProxyType(_ALL_TYPES)
+except ImportError:  # pragma: no cover
+    # Python 2 has no read-only dict view
+    ALL_TYPES = _ALL_TYPES
+# The filters that can be used on each DynamoDB data type
+_NUMBER_FILTERS = frozenset(['eq', 'ne', 'lte', 'lt', 'gte', 'gt', 'in',
+                             'between'])
+_STRING_FILTERS = _NUMBER_FILTERS | frozenset(['beginswith'])
+_SET_FILTERS = frozenset(['contains', 'ncontains', 'in'])
+_EQ_FILTERS = frozenset(['eq', 'ne'])
+_LIST_FILTERS = frozenset(['eq', 'ne', 'contains', 'ncontains'])
+_FILTERS_BY_DDB_TYPE = {
+    NUMBER: _NUMBER_FILTERS,
+    STRING: _STRING_FILTERS,
+    BINARY: _STRING_FILTERS,
+    NUMBER_SET: _SET_FILTERS,
+    STRING_SET: _SET_FILTERS,
+    BINARY_SET: _SET_FILTERS,
+    MAP: _EQ_FILTERS,
+    BOOL: _EQ_FILTERS,
+    LIST: _LIST_FILTERS,
+}
+# Type tuples for the numeric isinstance checks
+_FLOAT_OR_DECIMAL_TYPES = (float, Decimal)
+_INT_OR_DECIMAL_TYPES = six.integer_types + (Decimal,)
+_NUMBER_TYPES = six.integer_types + _FLOAT_OR_DECIMAL_TYPES
+_HAS_DECIMAL_FROM_FLOAT = hasattr(Decimal, 'from_float')
+# The DynamoDB set type for each type that can be stored in a set
+_SET_TYPES = {
+    STRING: STRING_SET,
+    NUMBER: NUMBER_SET,
+    BINARY: BINARY_SET,
+}
+# Characters that a JSON document may start with (python's json module also
+# accepts NaN and Infinity)
+_JSON_START_CHARS = frozenset('{["-0123456789tfnNI')
+# Shared TypeDefinition instances for the registered data types. Type
+# definitions hold no per-field state, so every Field can use the same one.
+_TYPE_INSTANCES = {}
+# Set factories created by SetType.bind, keyed by (class, item type)
+_SET_FACTORIES = {}
 
 
 def set_(data_type):
@@ -21,13 +66,37 @@ def set_(data_type):
 
 def register_type(type_class, allow_in_set=True):
     """ Register a type class for use with Fields """
-    ALL_TYPES[type_class.data_type] = type_class
+    data_type = type_class.data_type
+    _ALL_TYPES[data_type] = type_class
     if allow_in_set:
-        set_key = set_(type_class.data_type)
-        ALL_TYPES[set_key] = SetType.bind(type_class.data_type)
+        _ALL_TYPES[set_(data_type)] = SetType.bind(data_type)
     for alias in type_class.aliases:
-        ALL_TYPES[alias] = type_class
-        ALL_TYPES[set_(alias)] = SetType.bind(alias)
+        _ALL_TYPES[alias] = type_class
+        _ALL_TYPES[set_(alias)] = SetType.bind(alias)
+    # Registering may replace existing types, so drop any stale instances
+    _TYPE_INSTANCES.clear()
+
+
+def get_type(data_type):
+    """
+    Get the shared TypeDefinition instance for a registered data type
+
+    Raises
+    ------
+    exc : :class:`KeyError`
+        If the data type has not been registered
+
+    """
+    type_def = _TYPE_INSTANCES.get(data_type)
+    if type_def is None:
+        type_def = _TYPE_INSTANCES[data_type] = _ALL_TYPES[data_type]()
+    return type_def
+
+
+def _is_base_method(type_class, name):
+    """ Check if a TypeDefinition subclass inherits a method unchanged """
+    return (six.get_unbound_function(getattr(type_class, name)) is
+            six.get_unbound_function(getattr(TypeDefinition, name)))
 
 
 class TypeDefinition(UnicodeMixin):
@@ -46,29 +115,20 @@ class TypeDefinition(UnicodeMixin):
     mutable : bool
         If True, flywheel will track updates to this field automatically when
         making calls to sync()
-    allowed_filters : set
+    allowed_filters : frozenset
         The set of filters that can be used on this field type
 
     """
+    __slots__ = ('allowed_filters',)
     data_type = None
     aliases = []
     ddb_data_type = None
     mutable = False
 
     def __init__(self):
-        if self.ddb_data_type == NUMBER:
-            self.allowed_filters = set(['eq', 'ne', 'lte', 'lt', 'gte', 'gt',
-                                        'in', 'between'])
-        elif self.ddb_data_type in (STRING, BINARY):
-            self.allowed_filters = set(['eq', 'ne', 'lte', 'lt', 'gte', 'gt',
-                                        'in', 'between', 'beginswith'])
-        elif self.ddb_data_type in (NUMBER_SET, STRING_SET, BINARY_SET):
-            self.allowed_filters = set(['contains', 'ncontains', 'in'])
-        elif self.ddb_data_type in (MAP, BOOL):
-            self.allowed_filters = set(['eq', 'ne'])
-        elif self.ddb_data_type == LIST:
-            self.allowed_filters = set(['eq', 'ne', 'contains', 'ncontains'])
-        else:
+        try:
+            self.allowed_filters = _FILTERS_BY_DDB_TYPE[self.ddb_data_type]
+        except KeyError:
             raise ValueError("Unknown dynamo data type '%s'" %
                              self.ddb_data_type)
 
@@ -120,6 +180,9 @@ class TypeDefinition(UnicodeMixin):
         obj_type object
         """
         if isinstance(value, six.text_type):
+            # Don't bother running the parser on values that can't be JSON
+            if value.lstrip()[:1] not in _JSON_START_CHARS:
+                raise TypeError("Value %r is not valid JSON" % value)
             orig_value = value
             try:
                 value = json.loads(orig_value)
@@ -139,38 +202,40 @@ class TypeDefinition(UnicodeMixin):
 class SetType(TypeDefinition):
 
     """ Set types """
+    __slots__ = ('item_type', 'item_field', 'ddb_data_type', '_dump_identity',
+                 '_load_identity')
     data_type = set
     mutable = True
 
     def __init__(self, item_type=None, type_class=None):
         self.item_type = item_type
-        set_map = {
-            STRING: STRING_SET,
-            NUMBER: NUMBER_SET,
-            BINARY: BINARY_SET,
-        }
         if item_type is not None and type_class is None:
-            self.item_field = ALL_TYPES[item_type]()
-            self.ddb_data_type = set_map[self.item_field.ddb_data_type]
+            self.item_field = get_type(item_type)
+            self.ddb_data_type = _SET_TYPES[self.item_field.ddb_data_type]
         elif type_class is not None:
             self.item_field = type_class()
-            self.ddb_data_type = set_map[self.item_field.ddb_data_type]
+            self.ddb_data_type = _SET_TYPES[self.item_field.ddb_data_type]
         else:
             self.item_field = None
             self.ddb_data_type = STRING_SET
+        # If the item type doesn't transform values we can skip calling it on
+        # every element
+        self._dump_identity = self._load_identity = self.item_field is None
+        if self.item_field is not None:
+            item_class = type(self.item_field)
+            self._dump_identity = _is_base_method(item_class, 'ddb_dump')
+            self._load_identity = _is_base_method(item_class, 'ddb_load')
         super(SetType, self).__init__()
 
     def coerce(self, value, force):
-        if not isinstance(value, set):
+        if type(value) is not set and not isinstance(value, set):
             if force:
                 value = set(value)
             else:
                 raise TypeError()
         if self.item_field is not None:
-            converted_values = set()
-            for item in value:
-                converted_values.add(self.item_field.coerce(item, force))
-            return converted_values
+            coerce_item = self.item_field.coerce
+            return {coerce_item(item, force) for item in value}
         return value
 
     def ddb_dump_inner(self, value):
@@ -182,12 +247,16 @@ class SetType(TypeDefinition):
     def ddb_dump(self, value):
         if self.item_field is None:
             return value
-        return set([self.ddb_dump_inner(v) for v in value])
+        if self._dump_identity:
+            return set(value)
+        return set(map(self.item_field.ddb_dump, value))
 
     def ddb_load(self, value):
         if self.item_field is None:
             return value
-        return set([self.item_field.ddb_load(v) for v in value])
+        if self._load_identity:
+            return value if type(value) is set else set(value)
+        return set(map(self.item_field.ddb_load, value))
 
     def __unicode__(self):
         if self.item_type is None:
@@ -198,24 +267,32 @@ class SetType(TypeDefinition):
     @classmethod
     def bind(cls, item_type):
         """ Create a set factory that will contain a specific data type """
-        return functools.partial(cls, item_type)
+        key = (cls, item_type)
+        factory = _SET_FACTORIES.get(key)
+        if factory is None:
+            factory = _SET_FACTORIES[key] = functools.partial(cls, item_type)
+        return factory
 
 
 register_type(SetType, allow_in_set=False)
-ALL_TYPES[STRING_SET] = SetType.bind(STRING)
-ALL_TYPES[BINARY_SET] = SetType.bind(BINARY)
-ALL_TYPES[NUMBER_SET] = SetType.bind(NUMBER)
+_ALL_TYPES[STRING_SET] = SetType.bind(STRING)
+_ALL_TYPES[BINARY_SET] = SetType.bind(BINARY)
+_ALL_TYPES[NUMBER_SET] = SetType.bind(NUMBER)
 
 
 class NumberType(TypeDefinition):
 
     """ Any kind of numerical value """
+    __slots__ = ()
     data_type = NUMBER
     ddb_data_type = NUMBER
 
     def coerce(self, value, force):
-        if not (isinstance(value, float) or isinstance(value, Decimal) or
-                isinstance(value, six.integer_types)):
+        # Exact type checks are much cheaper than isinstance
+        value_type = type(value)
+        if value_type is int or value_type is float or value_type is Decimal:
+            return value
+        if not isinstance(value, _NUMBER_TYPES):
             if force:
                 try:
                     return int(value)
@@ -240,14 +317,16 @@ register_type(NumberType)
 class FloatType(TypeDefinition):
 
     """ Float values """
+    __slots__ = ()
     data_type = float
     ddb_data_type = NUMBER
 
     def coerce(self, value, force):
+        if type(value) is float:
+            return value
         if not isinstance(value, float):
             # Auto-convert ints, longs, and Decimals
-            if (isinstance(value, six.integer_types) or
-                    isinstance(value, Decimal)):
+            if isinstance(value, _INT_OR_DECIMAL_TYPES):
                 return float(value)
             elif force:
                 return float(value)
@@ -265,23 +344,27 @@ register_type(FloatType)
 class IntType(TypeDefinition):
 
     """ Integer values (includes longs) """
+    __slots__ = ()
     data_type = int
     aliases = list(six.integer_types)
     ddb_data_type = NUMBER
 
     def coerce(self, value, force):
-        if not isinstance(value, six.integer_types):
-            if force:
-                new_val = int(value)
-                if isinstance(value, float) or isinstance(value, Decimal):
-                    if new_val != value:
-                        raise ValueError("Refusing to convert "
-                                         "%r to int! Results in data loss!"
-                                         % repr(value))
-                return new_val
-            else:
-                raise TypeError()
-        return value
+        if type(value) is int or isinstance(value, six.integer_types):
+            return value
+        if not force:
+            raise TypeError()
+        new_val = int(value)
+        if type(value) is float:
+            lossy = not value.is_integer()
+        else:
+            lossy = (isinstance(value, _FLOAT_OR_DECIMAL_TYPES) and
+                     new_val != value)
+        if lossy:
+            raise ValueError("Refusing to convert "
+                             "%r to int! Results in data loss!"
+                             % repr(value))
+        return new_val
 
     def ddb_load(self, value):
         return int(value)
@@ -300,15 +383,17 @@ class DecimalType(TypeDefinition):
 
     """
 
+    __slots__ = ()
     data_type = Decimal
     ddb_data_type = NUMBER
 
     def coerce(self, value, force):
+        if type(value) is Decimal:
+            return value
         if not isinstance(value, Decimal):
             if force:
                 # Python 2.6 can't convert directly from float to Decimal
-                if (isinstance(value, float) and
-                        not hasattr(Decimal, 'from_float')):
+                if not _HAS_DECIMAL_FROM_FLOAT and isinstance(value, float):
                     return float_to_decimal(value)
                 return Decimal(value)
             else:
@@ -323,13 +408,13 @@ class BoolType(TypeDefinition):
 
     """ Boolean type """
 
+    __slots__ = ()
     data_type = bool
     ddb_data_type = BOOL
 
-    def __init__(self):
-        super(BoolType, self).__init__()
-
     def coerce(self, value, force):
+        if type(value) is bool:
+            return value
         value = self._attempt_coerce_json(value, bool)
         if not isinstance(value, bool):
             if force:
@@ -345,13 +430,19 @@ register_type(BoolType)
 class StringType(TypeDefinition):
 
     """ String values, stored as unicode """
+    __slots__ = ()
     data_type = six.text_type
     aliases = [STRING]
     ddb_data_type = STRING
 
     def coerce(self, value, force):
+        value_type = type(value)
+        if value_type is six.text_type:
+            return value
+        # Silently convert str to unicode using utf-8
+        if value_type is six.binary_type:
+            return value.decode('utf-8')
         if not isinstance(value, six.text_type):
-            # Silently convert str to unicode using utf-8
             if isinstance(value, six.binary_type):
                 return value.decode('utf-8')
             if force:
@@ -367,13 +458,19 @@ register_type(StringType)
 class BinaryType(TypeDefinition):
 
     """ Binary strings, stored as a str/bytes """
+    __slots__ = ()
     data_type = six.binary_type
     aliases = [BINARY, Binary]
     ddb_data_type = BINARY
 
     def coerce(self, value, force):
+        value_type = type(value)
+        if value_type is six.binary_type:
+            return value
+        # Silently convert unicode to str using utf-8
+        if value_type is six.text_type:
+            return value.encode('utf-8')
         if not isinstance(value, six.binary_type):
-            # Silently convert unicode to str using utf-8
             if isinstance(value, six.text_type):
                 return value.encode('utf-8')
             if force:
@@ -383,9 +480,13 @@ class BinaryType(TypeDefinition):
         return value
 
     def ddb_dump(self, value):
+        if type(value) is Binary:
+            return value
         return Binary(value)
 
     def ddb_load(self, value):
+        if type(value) is six.binary_type:
+            return value
         return value.value
 
 
@@ -395,14 +496,14 @@ register_type(BinaryType)
 class DictType(TypeDefinition):
 
     """ Dict type, stored as a map """
+    __slots__ = ()
     data_type = dict
     ddb_data_type = MAP
     mutable = True
 
-    def __init__(self):
-        super(DictType, self).__init__()
-
     def coerce(self, value, force):
+        if type(value) is dict:
+            return value
         value = self._attempt_coerce_json(value, dict)
         if not isinstance(value, dict):
             if force:
@@ -418,14 +519,14 @@ register_type(DictType)
 class ListType(TypeDefinition):
 
     """ List type """
+    __slots__ = ()
     data_type = list
     ddb_data_type = LIST
     mutable = True
 
-    def __init__(self):
-        super(ListType, self).__init__()
-
     def coerce(self, value, force):
+        if type(value) is list:
+            return value
         value = self._attempt_coerce_json(value, list)
         if not isinstance(value, list):
             if force:
@@ -457,7 +558,18 @@ class UTCTimezone(datetime.tzinfo):
         return ZERO
 
 
-UTC = UTCTimezone()
+try:
+    # The C implementation is much cheaper to call into
+    UTC = datetime.timezone.utc
+except AttributeError:  # pragma: no cover
+    # Python 2 has no built-in UTC timezone
+    UTC = UTCTimezone()
+# Precise enough to hold any datetime as microseconds, independent of the
+# thread's current decimal context
+_TIMESTAMP_CONTEXT = Context(prec=32)
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=UTC)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
 
 
 class DateTimeType(TypeDefinition):
@@ -483,6 +595,7 @@ class DateTimeType(TypeDefinition):
         field = Field(data_type=DateTimeType(naive=True))
 
     """
+    __slots__ = ('naive',)
     data_type = datetime.datetime
     ddb_data_type = NUMBER
 
@@ -491,18 +604,32 @@ class DateTimeType(TypeDefinition):
         self.naive = naive
 
     def ddb_dump(self, value):
-        seconds = calendar.timegm(value.utctimetuple())
-        milliseconds = value.strftime('%f')
-        return Decimal("%d.%s" % (seconds, milliseconds))
+        # Same as calendar.timegm(value.utctimetuple()), without building the
+        # time tuple. Naive datetimes are treated as UTC.
+        if value.utcoffset() is None:
+            delta = value - _EPOCH
+        else:
+            delta = value - _EPOCH_UTC
+        seconds = delta.days * 86400 + delta.seconds
+        # Equivalent to Decimal("%d.%06d" % (seconds, microsecond)), but built
+        # from integers instead of parsing a string
+        if seconds < 0:
+            micros = seconds * 1000000 - value.microsecond
+        else:
+            micros = seconds * 1000000 + value.microsecond
+        return Decimal(micros).scaleb(-6, _TIMESTAMP_CONTEXT)
 
     def ddb_load(self, value):
-        microseconds = int(1000000 * (value - int(value)))
-        dt = datetime.datetime.utcfromtimestamp(value) \
-            .replace(microsecond=microseconds)
+        seconds = int(value)
+        # ddb_dump writes the whole seconds followed by the microseconds, so
+        # the fraction of a negative timestamp still counts forward in time
+        delta = datetime.timedelta(
+            seconds=seconds,
+            microseconds=int(1000000 * abs(value - seconds)))
         if self.naive:
-            return dt
+            return _EPOCH + delta
         else:
-            return dt.replace(tzinfo=UTC)
+            return _EPOCH_UTC + delta
 
 
 register_type(DateTimeType)
@@ -511,14 +638,20 @@ register_type(DateTimeType)
 class DateType(TypeDefinition):
 
     """ Dates, stored as timestamps """
+    __slots__ = ()
     data_type = datetime.date
     ddb_data_type = NUMBER
 
     def ddb_dump(self, value):
+        if type(value) is datetime.date:
+            return (value.toordinal() - _EPOCH_ORDINAL) * 86400
         return calendar.timegm(value.timetuple())
 
     def ddb_load(self, value):
-        return datetime.datetime.utcfromtimestamp(value).date()
+        # Round down like utcfromtimestamp, so a fractional timestamp before
+        # 1970 still lands on the previous day
+        return datetime.date.fromordinal(_EPOCH_ORDINAL +
+                                         int(math.floor(value)) // 86400)
 
 
 register_type(DateType)
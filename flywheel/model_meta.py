@@ -1,13 +1,30 @@
 """ Model metadata and metaclass objects """
 import six
+import copy
 import time
 
-import inspect
-from dynamo3 import DynamoKey, Throughput, IndexUpdate
-from collections import defaultdict
+from dynamo3 import DynamoKey, Throughput, IndexUpdate, is_null
+from collections import defaultdict, OrderedDict
 
 from .fields import Field
-from .fields.conditions import FILTER_ONLY
+from .fields.conditions import FILTER_ONLY, filter_key
+
+# Maximum number of query shapes to remember per model in
+# get_ordering_from_fields
+_MAX_ORDERING_CACHE = 128
+
+
+def _wait_until(check, delay=0.2, max_delay=5):
+    """ Poll check() with exponential backoff until it returns True """
+    while not check():
+        time.sleep(delay)
+        delay = min(2 * delay, max_delay)
+
+
+def wait_for_active(connection, tablename):
+    """ Block until a table has finished being created or updated """
+    _wait_until(lambda: connection.describe_table(tablename).status ==
+                'ACTIVE')
 
 
 class ValidationError(Exception):
@@ -25,45 +42,51 @@ class Ordering(object):
     primary key, a local secondary index, or a global secondary index.
 
     """
+    __slots__ = ('meta', 'hash_key', 'range_key', 'index_name',
+                 '_hash_eq_key', '_range_eq_key')
 
     def __init__(self, meta, hash_key, range_key=None, index_name=None):
         self.meta = meta
         self.hash_key = hash_key
         self.range_key = range_key
         self.index_name = index_name
+        # The key equality arguments are the same for every query
+        self._hash_eq_key = None
+        if hash_key is not None:
+            self._hash_eq_key = filter_key(hash_key.name, 'eq')
+        self._range_eq_key = None
+        if range_key is not None:
+            self._range_eq_key = filter_key(range_key.name, 'eq')
 
     def query_kwargs(self, eq_fields, fields):
         """ Get the query and filter kwargs for querying against this index """
-        kwargs = {'%s__eq' % self.hash_key.name:
-                  self.hash_key.resolve(scope=eq_fields)}
+        kwargs = {self._hash_eq_key: self.hash_key.resolve(scope=eq_fields)}
         if self.index_name is not None:
             kwargs['index'] = self.index_name
-        remaining = set(eq_fields)
-        remaining = remaining.union(fields)
+        remaining = set(eq_fields).union(fields)
         remaining -= self.hash_key.can_resolve(eq_fields)
         if self.range_key is not None:
             eq_range_fields = self.range_key.can_resolve(eq_fields)
             if eq_range_fields:
                 remaining -= eq_range_fields
-                key = '%s__eq' % self.range_key.name
                 val = self.range_key.resolve(scope=eq_fields)
-                kwargs[key] = val
+                kwargs[self._range_eq_key] = val
             else:
                 for field in self.range_key.can_resolve(fields):
                     (op, val) = fields[field]
                     if op in FILTER_ONLY:
                         continue
-                    kwargs['%s__%s' % (field, op)] = val
+                    kwargs[filter_key(field, op)] = val
                     remaining.remove(field)
 
         # Find the additional filter arguments
         filter_fields = {}
         for key in remaining:
             if key in eq_fields:
-                filter_fields['%s__eq' % key] = eq_fields[key]
+                filter_fields[filter_key(key, 'eq')] = eq_fields[key]
             else:
                 op, val = fields[key]
-                filter_fields['%s__%s' % (key, op)] = val
+                filter_fields[filter_key(key, op)] = val
         kwargs['filter'] = filter_fields
 
         return kwargs
@@ -171,6 +194,9 @@ class ModelMetadata(object):
         Mapping of field names to set of fields that change when that field
         changes (usually just that field name, but can be more if composite
         fields use it)
+    pk_fields : frozenset
+        Names of the fields that are, or are used to build, the hash or range
+        key
     orderings : list
         List of :class:`.Ordering`
     throughput : dict
@@ -193,38 +219,79 @@ class ModelMetadata(object):
             self.throughput = Throughput(**self.throughput)
         # pylint: enable=E1134
         self.name = self._name
+        self.abstract = self._abstract
         self.fields = {}
         self.hash_key = None
         self.range_key = None
-        self.related_fields = defaultdict(set)
-        self.all_global_indexes = set()
-        for gindex in self.global_indexes:
-            self.all_global_indexes.add(gindex.hash_key)
-            if gindex.range_key is not None:
-                self.all_global_indexes.add(gindex.range_key)
+        self.related_fields = {}
+        self.pk_fields = frozenset()
+        self._all_global_indexes = None
+        self._tablenames = {}
+        self._ddb_table_keys = None
+        self._defaults = None
+        self._ordering_cache = OrderedDict()
+        self._orderings_by_index = {}
+        self._table_ordering = None
+        self._hash_key_fields = ()
+        self._range_key_fields = ()
+        self._index_fields = ()
+        self._composite_fields = ()
 
     def post_create(self):
         """ Create the orderings """
-        for name, member in inspect.getmembers(self.model):
-            if isinstance(member, Field):
-                if name.startswith('__') or name.endswith('_'):
-                    raise ValidationError("Field '%s' cannot begin with '__' "
-                                          "or end with '_'" % name)
-                self.fields[name] = member
-                member.name = name
-                member.model = self.model
-                if member.hash_key:
-                    self.hash_key = member
-                elif member.range_key:
-                    self.range_key = member
-
+        # Walk the class dicts directly instead of using inspect.getmembers,
+        # which would call getattr on every attribute of the model. The first
+        # class in the MRO to define a name wins, just like attribute lookup.
+        members = {}
+        seen = set()
+        for klass in self.model.__mro__:
+            for name, member in klass.__dict__.items():
+                if name not in seen:
+                    seen.add(name)
+                    if isinstance(member, Field):
+                        members[name] = member
+        hash_key_fields = []
+        range_key_fields = []
+        index_fields = []
+        composite_fields = []
+        for name in sorted(members):
+            member = members[name]
+            if name.startswith('__') or name.endswith('_'):
+                raise ValidationError("Field '%s' cannot begin with '__' "
+                                      "or end with '_'" % name)
+            self.fields[name] = member
+            member.name = name
+            member.model = self.model
+            if member.hash_key:
+                self.hash_key = member
+                hash_key_fields.append(member)
+            elif member.range_key:
+                self.range_key = member
+            if member.range_key:
+                range_key_fields.append(member)
+            if member.index:
+                index_fields.append(member)
+            if member.composite:
+                composite_fields.append(member)
+        self._hash_key_fields = tuple(hash_key_fields)
+        self._range_key_fields = tuple(range_key_fields)
+        self._index_fields = tuple(index_fields)
+        self._composite_fields = tuple(composite_fields)
+
+        # post_create is run again when the indexes change, so drop anything
+        # looked up from the old orderings
+        self._ordering_cache.clear()
+        self._orderings_by_index = {}
+        # The fields and indexes may have changed as well
+        self._defaults = None
+        self._all_global_indexes = None
+        self._ddb_table_keys = None
         self.orderings.append(self.__order_class__(self, self.hash_key,
                                                    self.range_key))
-        for field in six.itervalues(self.fields):
-            if field.index:
-                order = self.__order_class__(self, self.hash_key, field,
-                                             field.index_name)
-                self.orderings.append(order)
+        for field in self._index_fields:
+            order = self.__order_class__(self, self.hash_key, field,
+                                         field.index_name)
+            self.orderings.append(order)
 
         for index in self.global_indexes:
             for key in index:
@@ -241,20 +308,44 @@ class ModelMetadata(object):
                                                            index.hash_key],
                                                        range_key, index.name))
 
+        # If index names collide, the first ordering wins (as in a linear scan)
+        for order in self.orderings:
+            self._orderings_by_index.setdefault(order.index_name, order)
+        self._table_ordering = self.orderings[0]
+
     def post_validate(self):
         """ Build the dict of related fields """
-        def update_related(field, name):
-            """ Recursively add a field to related """
-            for f in field.subfields:
-                self.related_fields[f].add(name)
-                subfield = self.fields[f]
-                if subfield.composite:
-                    update_related(subfield, name)
+        closures = {}
 
-        for field in six.itervalues(self.fields):
-            self.related_fields[field.name].add(field.name)
-            if field.composite:
-                update_related(field, field.name)
+        def subfield_closure(field):
+            """ Get all the fields a composite field is built from """
+            names = closures.get(field.name)
+            if names is None:
+                names = set(field.subfields)
+                for f in field.subfields:
+                    subfield = self.fields[f]
+                    if subfield.composite:
+                        names.update(subfield_closure(subfield))
+                closures[field.name] = names
+            return names
+
+        related_fields = defaultdict(set)
+        for field in self.fields.values():
+            related_fields[field.name].add(field.name)
+        for field in self._composite_fields:
+            for f in subfield_closure(field):
+                related_fields[f].add(field.name)
+        # These are read on every attribute change, and should never change
+        # once the model is built
+        self.related_fields = dict((name, frozenset(related)) for
+                                   name, related in related_fields.items())
+        key_names = set()
+        for key in (self.hash_key, self.range_key):
+            if key is not None:
+                key_names.add(key.name)
+        self.pk_fields = frozenset(name for name, related in
+                                   self.related_fields.items()
+                                   if not key_names.isdisjoint(related))
 
     def get_ordering_from_fields(self, eq_fields, fields):
         """
@@ -282,6 +373,23 @@ class ModelMetadata(object):
             If more than one possible Ordering is found
 
         """
+        # The result only depends on which field names are constrained, and
+        # applications tend to repeat the same few query shapes
+        cache_key = (frozenset(eq_fields), frozenset(fields))
+        try:
+            return self._ordering_cache[cache_key]
+        except KeyError:
+            pass
+        ordering = self._get_ordering_from_fields(eq_fields, fields)
+        if ordering is None:
+            return None
+        if len(self._ordering_cache) >= _MAX_ORDERING_CACHE:
+            self._ordering_cache.popitem(last=False)
+        self._ordering_cache[cache_key] = ordering
+        return ordering
+
+    def _get_ordering_from_fields(self, eq_fields, fields):
+        """ Uncached implementation of get_ordering_from_fields """
         index_satisfied_orderings = []
         other_orderings = []
         eq_field_set = set(eq_fields)
@@ -318,10 +426,11 @@ class ModelMetadata(object):
 
     def get_ordering_from_index(self, index):
         """ Get the ordering with matching index name """
-        for order in self.orderings:
-            if order.index_name == index:
-                return order
-        raise ValueError("Cannot find ordering with index name '%s'" % index)
+        try:
+            return self._orderings_by_index[index]
+        except KeyError:
+            raise ValueError("Cannot find ordering with index name '%s'" %
+                             index)
 
     def rk(self, obj=None, scope=None):
         """ Construct the range key value """
@@ -334,38 +443,84 @@ class ModelMetadata(object):
 
     def pk_tuple(self, obj=None, scope=None, ddb_dump=False, ddb_load=False):
         """ Get a tuple that represents the primary key for an item """
-        hk = self.hk(obj, scope)
-        if ddb_dump:
-            hk = self.hash_key.ddb_dump(hk)
-        elif ddb_load:
-            hk = self.hash_key.ddb_load(hk)
-        if self.range_key is None:
+        hash_key, range_key = self.hash_key, self.range_key
+        hk = hash_key.resolve(obj, scope)
+        if range_key is None:
+            if ddb_dump:
+                return (hash_key.ddb_dump(hk),)
+            elif ddb_load:
+                return (hash_key.ddb_load(hk),)
             return (hk,)
-        rk = self.rk(obj, scope)
+        rk = range_key.resolve(obj, scope)
         if ddb_dump:
-            rk = self.range_key.ddb_dump(rk)
+            return (hash_key.ddb_dump(hk), range_key.ddb_dump(rk))
         elif ddb_load:
-            rk = self.range_key.ddb_load(rk)
+            return (hash_key.ddb_load(hk), range_key.ddb_load(rk))
         return (hk, rk)
 
     def pk_dict(self, obj=None, scope=None, ddb_dump=False):
         """ Get the dynamo primary key dict for an item """
-        return self.index_pk_dict(None, obj, scope, ddb_dump)
+        return self._table_ordering.pk_dict(obj, scope, ddb_dump)
 
     def index_pk_dict(self, index_name, obj=None, scope=None, ddb_dump=False):
         """ Get the primary key dict for an index (includes the table key) """
         # Get the 'table' index, which is the hash & range key
-        table_order = self.get_ordering_from_index(None)
-        pk = table_order.pk_dict(obj, scope, ddb_dump)
+        pk = self._table_ordering.pk_dict(obj, scope, ddb_dump)
         if index_name is not None:
             ordering = self.get_ordering_from_index(index_name)
             pk.update(ordering.pk_dict(obj, scope, ddb_dump))
         return pk
 
+    def defaults(self):
+        """
+        Get the field values that a new instance of the model starts with
+
+        This is computed on first use and then reused for every instance.
+
+        Returns
+        -------
+        values : dict
+            Mapping of non-composite field names to their coerced defaults
+        dirty : frozenset
+            Names of the fields with a non-null default
+        copied : tuple
+            Names of the fields whose default must be copied for each
+            instance, because copying it gives a new object
+
+        """
+        if self._defaults is None:
+            values = {}
+            dirty = set()
+            copied = []
+            for name, field in self.fields.items():
+                if field.composite:
+                    continue
+                default = field.default
+                value = field.coerce(default)
+                values[name] = value
+                if not is_null(default):
+                    dirty.add(name)
+                # Decide by the value, not the data type. Any type can be
+                # given a mutable default (e.g. a dict for a custom type).
+                if copy.copy(value) is not value:
+                    copied.append(name)
+            self._defaults = (values, frozenset(dirty), tuple(copied))
+        return self._defaults
+
     @property
-    def abstract(self):
-        """ Getter for abstract """
-        return self._abstract
+    def all_global_indexes(self):
+        """ Set of all field names used as keys in the global indexes """
+        if self._all_global_indexes is None:
+            keys = set()
+            for gindex in self.global_indexes:
+                keys.update(gindex)
+            self._all_global_indexes = keys
+        return self._all_global_indexes
+
+    @all_global_indexes.setter
+    def all_global_indexes(self, value):
+        """ Override the set of global index key names """
+        self._all_global_indexes = value
 
     def ddb_tablename(self, namespace=()):
         """
@@ -380,18 +535,29 @@ class ModelMetadata(object):
         """
         if self.abstract:
             return None
-        elif isinstance(namespace, six.string_types):
-            return namespace + self.name
+        # This is called for every item in a batch, and engines almost
+        # always pass the same namespace. Lists are the common form, so key
+        # the cache on a tuple of the parts.
+        is_string = isinstance(namespace, six.string_types)
+        key = namespace if is_string else tuple(namespace)
+        try:
+            return self._tablenames[key]
+        except KeyError:
+            pass
+        if is_string:
+            tablename = namespace + self.name
         else:
-            return '-'.join(tuple(namespace) + (self.name,))
+            tablename = '-'.join(key + (self.name,))
+        self._tablenames[key] = tablename
+        return tablename
 
     def validate_model(self):
         """ Perform validation checks on the model declaration """
         if self.abstract or self.model.__dict__.get('__abstract__'):
             return
-        hash_keys = [f for f in self.fields.values() if f.hash_key]
-        range_keys = [f for f in self.fields.values() if f.range_key]
-        indexes = [f for f in self.fields.values() if f.index]
+        hash_keys = self._hash_key_fields
+        range_keys = self._range_key_fields
+        indexes = self._index_fields
         name = self.name
         if len(hash_keys) != 1:
             raise ValidationError("Model %s must have exactly one hash key" %
@@ -408,16 +574,15 @@ class ModelMetadata(object):
         if len(self.global_indexes) > 5:
             raise ValidationError("Model %s can't have more than 5 "
                                   "global indexes" % name)
-        for field in self.fields.values():
-            if field.composite:
-                for f in field.subfields:
-                    if f not in self.fields:
-                        raise ValidationError("Model %s key %s references "
-                                              "unknown field '%s'" %
-                                              (name, field.name, f))
-                    if f == field.name:
-                        raise ValidationError("Model %s key %s cannot contain "
-                                              "itself" % (name, field.name))
+        for field in self._composite_fields:
+            for f in field.subfields:
+                if f not in self.fields:
+                    raise ValidationError("Model %s key %s references "
+                                          "unknown field '%s'" %
+                                          (name, field.name, f))
+                if f == field.name:
+                    raise ValidationError("Model %s key %s cannot contain "
+                                          "itself" % (name, field.name))
 
     def create_dynamo_schema(self, connection, tablenames=None, test=False,
                              wait=False, throughput=None, namespace=()):
@@ -458,9 +623,7 @@ class ModelMetadata(object):
         elif test:
             return tablename
 
-        indexes = []
         global_indexes = []
-        hash_key = None
 
         if throughput is not None:
             table_throughput = Throughput(throughput['read'],
@@ -468,16 +631,19 @@ class ModelMetadata(object):
         else:
             table_throughput = self.throughput
 
-        hash_key = DynamoKey(self.hash_key.name,
-                             data_type=self.hash_key.ddb_data_type)
-        range_key = None
-        if self.range_key is not None:
-            range_key = DynamoKey(self.range_key.name,
-                                  data_type=self.range_key.ddb_data_type)
-        for field in six.itervalues(self.fields):
-            if field.index:
-                idx = field.get_ddb_index()
-                indexes.append(idx)
+        # The table keys and local indexes only depend on the model
+        # definition. Global indexes are rebuilt because callers may override
+        # their throughput.
+        if self._ddb_table_keys is None:
+            hash_key = DynamoKey(self.hash_key.name,
+                                 data_type=self.hash_key.ddb_data_type)
+            range_key = None
+            if self.range_key is not None:
+                range_key = DynamoKey(self.range_key.name,
+                                      data_type=self.range_key.ddb_data_type)
+            indexes = [field.get_ddb_index() for field in self._index_fields]
+            self._ddb_table_keys = (hash_key, range_key, indexes)
+        hash_key, range_key, indexes = self._ddb_table_keys
 
         for gindex in self.global_indexes:
             index = gindex.get_ddb_index(self.fields)
@@ -489,10 +655,7 @@ class ModelMetadata(object):
             connection.create_table(tablename, hash_key, range_key,
                                     indexes, global_indexes, table_throughput)
             if wait:
-                desc = connection.describe_table(tablename)
-                while desc.status != 'ACTIVE':
-                    time.sleep(1)
-                    desc = connection.describe_table(tablename)
+                wait_for_active(connection, tablename)
 
         return tablename
 
@@ -566,10 +729,7 @@ class ModelMetadata(object):
         if not test:
             connection.update_table(tablename, index_updates=updates)
             if wait:
-                desc = connection.describe_table(tablename)
-                while desc.status != 'ACTIVE':
-                    time.sleep(1)
-                    desc = connection.describe_table(tablename)
+                wait_for_active(connection, tablename)
 
         return tablename
 
@@ -607,8 +767,7 @@ class ModelMetadata(object):
             if not test:
                 connection.delete_table(tablename)
                 if wait:
-                    desc = connection.describe_table(tablename)
-                    while desc is not None:
-                        desc = connection.describe_table(tablename)
+                    _wait_until(lambda: connection.describe_table(
+                        tablename) is None)
             return tablename
         return None
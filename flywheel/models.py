@@ -5,7 +5,6 @@ import copy
 import itertools
 import logging
 
-from dynamo3 import is_null
 from .fields import Field, NUMBER
 from .model_meta import ModelMetaclass, ModelMetadata, Ordering
 
@@ -25,6 +24,7 @@ class SetDelta(object):
     :meth:`~.Model.remove_`
 
     """
+    __slots__ = ('action', 'values')
 
     def __init__(self):
         self.action = None
@@ -42,16 +42,11 @@ class SetDelta(object):
         """
         if other is None:
             other = set()
-        new = set()
-        new.update(other)
         if self.action == 'ADD':
-            new.update(self.values)
-        elif other.issuperset(self.values):
-            new.difference_update(self.values)
-        else:
+            return other | self.values
+        if not self.values.issubset(other):
             raise KeyError("Cannot remove values that are not in the set!")
-
-        return new
+        return other - self.values
 
     def add(self, action, value):
         """
@@ -125,6 +120,7 @@ class Model(six.with_metaclass(ModelMetaclass)):
     __incrs__ = None
     _persisted = False
     _loading = False
+    _pk_cached = None
 
     def __init__(self, *args, **kwargs):  # pylint: disable=W0231
         if len(args) > 2 or (len(args) > 1 and self.meta_.range_key is None):
@@ -176,22 +172,22 @@ class Model(six.with_metaclass(ModelMetaclass)):
     def __new__(cls, *_, **__):
         """ Override __new__ to set default field values """
         obj = super(Model, cls).__new__(cls)
-        mark_dirty = []
-        with obj.loading_():
-            for name, field in six.iteritems(cls.meta_.fields):
-                if not field.composite:
-                    setattr(obj, name, field.default)
-                    if not is_null(field.default):
-                        mark_dirty.append(name)
-        obj.__dirty__.update(mark_dirty)
+        values, dirty, copied = cls.meta_.defaults()
+        obj_dict = obj.__dict__
+        obj_dict.update(values)
+        # Mutable defaults must not be shared between instances
+        for name in copied:
+            obj_dict[name] = copy.copy(values[name])
+        # New models have always been initialized through post_load_, and
+        # subclasses may hook into it
+        obj.post_load_(None)
+        obj.__dirty__.update(dirty)
         obj._persisted = False
         return obj
 
     def _is_field_primary(self, key):
         """ Check if a given field is part of the primary key """
-        return ((self.meta_.hash_key.name in self.meta_.related_fields[key]) or
-                (self.meta_.range_key is not None and
-                 self.meta_.range_key.name in self.meta_.related_fields[key]))
+        return key in self.meta_.pk_fields
 
     def __setattr__(self, name, value):
         field = self.meta_.fields.get(name)
@@ -201,13 +197,15 @@ class Model(six.with_metaclass(ModelMetaclass)):
             # Ignore if trying to set a composite field
             if field.composite:
                 return
-            if self.persisted_:
-                if self._is_field_primary(name):
+            if self._is_field_primary(name):
+                if self.persisted_:
                     if value != getattr(self, name):
                         raise AttributeError(
                             "Cannot change an item's primary key!")
                     else:
                         return
+                # The key used by __hash__ and __eq__ is about to change
+                self._pk_cached = None
             coerced_value = field.coerce(value)
             # Mutable fields check if they're dirty during sync()
             if field.is_mutable:
@@ -224,8 +222,12 @@ class Model(six.with_metaclass(ModelMetaclass)):
             self.mark_dirty_(name)
             if (not self._loading and self.persisted_ and
                     name not in self.__cache__):
+                fields = self.meta_.fields
                 for related in self.meta_.related_fields[name]:
-                    cached_var = copy.copy(getattr(self, related))
+                    cached_var = getattr(self, related)
+                    # Immutable values can be cached by reference
+                    if fields[related].is_mutable:
+                        cached_var = copy.copy(cached_var)
                     self.__cache__[related] = cached_var
             return super(Model, self).__setattr__(name, coerced_value)
 
@@ -241,15 +243,6 @@ class Model(six.with_metaclass(ModelMetaclass)):
         else:
             setattr(self, name, None)
 
-    def __getattribute__(self, name):
-        if not name.startswith('__') and not name.endswith('_'):
-            # Don't interfere with magic attrs or attrs ending in '_'
-            field = self.meta_.fields.get(name)
-            # Intercept getattribute to construct composite fields on the fly
-            if field is not None and field.composite:
-                return field.resolve(self)
-        return super(Model, self).__getattribute__(name)
-
     def mark_dirty_(self, name):
         """ Mark that a field is dirty """
         if self._loading or self.__dirty__ is None:
@@ -383,7 +376,10 @@ class Model(six.with_metaclass(ModelMetaclass)):
         for name in fields:
             self.__incrs__.pop(name, None)
             if name in self.__cache__:
-                self.__cache__[name] = copy.copy(getattr(self, name))
+                val = getattr(self, name)
+                if self.meta_.fields[name].is_mutable:
+                    val = copy.copy(val)
+                self.__cache__[name] = val
 
     def post_save_(self):
         """ Called after item is saved to database """
@@ -431,8 +427,8 @@ class Model(six.with_metaclass(ModelMetaclass)):
     def ddb_dump_(self):
         """ Return a dict for inserting into DynamoDB """
         data = {}
-        for name in self.meta_.fields:
-            data[name] = self.ddb_dump_field_(name)
+        for name, field in six.iteritems(self.meta_.fields):
+            data[name] = field.ddb_dump(getattr(self, name))
 
         return data
 
@@ -448,9 +444,18 @@ class Model(six.with_metaclass(ModelMetaclass)):
     def ddb_load_(cls, engine, data):
         """ Load a model from DynamoDB data """
         obj = cls.__new__(cls)
-        with obj.loading_(engine):
-            for key, val in data.items():
-                obj.set_ddb_val_(key, val)
+        # The object is brand new and not yet persisted, so there is no dirty
+        # or cache bookkeeping to do. Store the values directly instead of
+        # going through __setattr__.
+        fields = cls.meta_.fields
+        obj_dict = obj.__dict__
+        for key, val in data.items():
+            field = fields.get(key)
+            if field is None:
+                LOG.debug("Ignoring undeclared field %r", key)
+            elif not field.composite:
+                obj_dict[key] = field.coerce(field.ddb_load(val))
+        obj.post_load_(engine)
         return obj
 
     def ddb_dump_cached_(self, name):
@@ -461,7 +466,7 @@ class Model(six.with_metaclass(ModelMetaclass)):
     def construct_ddb_expects_(self, fields=None):
         """ Construct a dynamo "expects" mapping based on the cached fields """
         if fields is None:
-            fields = self.keys_()
+            fields = self.meta_.fields
         expect = {}
         for name in fields:
             val = self.ddb_dump_cached_(name)
@@ -494,14 +499,24 @@ class Model(six.with_metaclass(ModelMetaclass)):
             data[name] = getattr(self, name)
         return data
 
+    def _primary_key(self):
+        """ The (hash key, range key) pair, cached once the item is persisted """
+        key = self._pk_cached
+        if key is None:
+            key = (self.hk_, self.rk_)
+            # The primary key cannot change after the item is persisted
+            if self._persisted:
+                self._pk_cached = key
+        return key
+
     def __hash__(self):
-        return hash(self.hk_) + hash(self.rk_)
+        hash_key, range_key = self._primary_key()
+        return hash(hash_key) + hash(range_key)
 
     def __eq__(self, other):
         return (isinstance(other, self.__class__) and
                 self.meta_.name == other.meta_.name and
-                self.hk_ == other.hk_ and
-                self.rk_ == other.rk_)
+                self._primary_key() == other._primary_key())
 
     def __ne__(self, other):
         return not self.__eq__(other)
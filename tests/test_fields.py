@@ -1,7 +1,8 @@
 """ Tests for fields """
+import calendar
 import six
 import zlib
-from datetime import datetime, date
+from datetime import datetime, date, timedelta, tzinfo
 
 import json
 from decimal import Decimal
@@ -108,6 +109,37 @@ class TestCreateFields(unittest.TestCase):
         Field(data_type=CompressedDict)
         Field(data_type=CompressedDict())
 
+    def test_unhashable_custom_type(self):
+        """ Can create a field with an unhashable data type instance """
+        class UnhashableDict(CompressedDict):
+            """ Custom data type that defines __eq__ but not __hash__ """
+            __hash__ = None
+
+            def __eq__(self, other):
+                return isinstance(other, UnhashableDict)
+
+        data_type = UnhashableDict()
+        field = Field(data_type=data_type)
+        self.assertTrue(field.data_type is data_type)
+
+    def test_registered_type_error(self):
+        """ Errors from constructing a registered data type propagate """
+        class BrokenType(CompressedDict):
+            """ Custom data type that can't be constructed """
+            data_type = 'broken'
+
+            def __init__(self):
+                raise KeyError('missing setting')
+
+        register_type(BrokenType)
+        with self.assertRaises(KeyError):
+            Field(data_type='broken')
+
+    def test_unhashable_data_type(self):
+        """ Unhashable data types that aren't TypeDefinitions are disallowed """
+        with self.assertRaises(TypeError):
+            Field(data_type=['foo'])
+
 
 class TestFieldCoerce(unittest.TestCase):
 
@@ -315,6 +347,218 @@ class TestFieldCoerce(unittest.TestCase):
         self.assertEqual(dt.tzinfo, UTC)
 
 
+class FixedOffset(tzinfo):
+
+    """ Timezone with a fixed offset from UTC """
+
+    def __init__(self, hours):
+        super(FixedOffset, self).__init__()
+        self.offset = timedelta(hours=hours)
+
+    def utcoffset(self, dt):
+        return self.offset
+
+    def dst(self, dt):
+        return timedelta(0)
+
+    def tzname(self, dt):
+        return 'UTC%+d' % (self.offset.seconds // 3600)
+
+
+def timestamp_dump(value):
+    """ Reference implementation of dumping a datetime to a timestamp """
+    seconds = calendar.timegm(value.utctimetuple())
+    return Decimal("%d.%s" % (seconds, value.strftime('%f')))
+
+
+def timestamp_load(value):
+    """ Reference implementation of loading a datetime from a timestamp """
+    seconds = int(value)
+    microseconds = int(1000000 * (value - seconds))
+    return datetime.utcfromtimestamp(seconds).replace(microsecond=microseconds)
+
+
+DATETIMES = [
+    datetime(2015, 5, 28, 15, 48, 9, 27812),
+    datetime(2015, 5, 28, 15, 48, 9),
+    datetime(2015, 5, 28, 15, 48, 9, 1),
+    datetime(2015, 5, 28, 15, 48, 9, 999999),
+    datetime(1970, 1, 1),
+    datetime(1970, 1, 1, 0, 0, 0, 1),
+    datetime(1969, 12, 31, 23, 59, 59),
+    datetime(1969, 12, 31, 23, 59, 59, 500000),
+    datetime(1900, 1, 1, 12, 30, 0, 123456),
+    datetime(2100, 12, 31, 23, 59, 59, 999999),
+]
+
+
+class TestDateTimeType(unittest.TestCase):
+
+    """ Tests for converting datetimes to and from Dynamo """
+
+    def setUp(self):
+        super(TestDateTimeType, self).setUp()
+        self.field = Field(data_type=datetime)
+
+    def test_dump_naive(self):
+        """ Naive datetimes dump as UTC timestamps """
+        for value in DATETIMES:
+            self.assertEqual(self.field.ddb_dump(value),
+                             timestamp_dump(value))
+
+    def test_dump_aware(self):
+        """ Aware datetimes dump the same as the naive UTC datetime """
+        for value in DATETIMES:
+            aware = value.replace(tzinfo=UTC)
+            self.assertEqual(self.field.ddb_dump(aware),
+                             self.field.ddb_dump(value))
+            self.assertEqual(self.field.ddb_dump(aware),
+                             timestamp_dump(aware))
+
+    def test_dump_offset(self):
+        """ Datetimes in other timezones dump as the same moment in UTC """
+        for value in DATETIMES[:4]:
+            local = value.replace(tzinfo=FixedOffset(-5))
+            self.assertEqual(self.field.ddb_dump(local),
+                             timestamp_dump(local))
+            self.assertEqual(self.field.ddb_dump(local),
+                             self.field.ddb_dump(value + timedelta(hours=5)))
+
+    def test_dump_microseconds(self):
+        """ Dumped timestamps keep microsecond precision """
+        value = datetime(2015, 5, 28, 15, 48, 9, 27812)
+        self.assertEqual(self.field.ddb_dump(value),
+                         Decimal('1432828089.027812'))
+
+    def test_round_trip(self):
+        """ Loading a dumped datetime gives back the same datetime """
+        naive_field = Field(data_type=DateTimeType(naive=True))
+        for value in DATETIMES:
+            aware = value.replace(tzinfo=UTC)
+            self.assertEqual(self.field.ddb_load(self.field.ddb_dump(aware)),
+                             aware)
+            self.assertEqual(naive_field.ddb_load(naive_field.ddb_dump(value)),
+                             value)
+
+    def test_round_trip_offset(self):
+        """ Datetimes in other timezones load as the same moment in UTC """
+        value = datetime(2015, 5, 28, 15, 48, 9, 27812,
+                         tzinfo=FixedOffset(-5))
+        loaded = self.field.ddb_load(self.field.ddb_dump(value))
+        self.assertEqual(loaded, value)
+        self.assertEqual(loaded.tzinfo, UTC)
+
+    def test_load_decimal(self):
+        """ Decimal timestamps from Dynamo load with full precision """
+        naive_field = Field(data_type=DateTimeType(naive=True))
+        for value in DATETIMES:
+            dumped = naive_field.ddb_dump(value)
+            loaded = naive_field.ddb_load(Decimal(str(dumped)))
+            self.assertEqual(loaded, value)
+            self.assertIsNone(loaded.tzinfo)
+            if dumped >= 0 or value.microsecond == 0:
+                self.assertEqual(loaded, timestamp_load(dumped))
+
+    def test_load_whole_seconds(self):
+        """ Timestamps with no fraction load with no microseconds """
+        field = Field(data_type=DateTimeType(naive=True))
+        self.assertEqual(field.ddb_load(Decimal('1432828089')),
+                         datetime(2015, 5, 28, 15, 48, 9))
+        self.assertEqual(field.ddb_load(Decimal('-1')),
+                         datetime(1969, 12, 31, 23, 59, 59))
+
+
+class TestBinaryType(unittest.TestCase):
+
+    """ Tests for converting binary data to and from Dynamo """
+
+    def setUp(self):
+        super(TestBinaryType, self).setUp()
+        self.field = Field(data_type=BINARY)
+
+    def test_dump_bytes(self):
+        """ Bytes dump as a Binary wrapping the same bytes """
+        dumped = self.field.ddb_dump(b'abc')
+        self.assertTrue(isinstance(dumped, Binary))
+        self.assertEqual(dumped.value, b'abc')
+
+    def test_dump_unicode(self):
+        """ Unicode dumps as a Binary of its utf-8 encoding """
+        dumped = self.field.ddb_dump(six.u('caf\u00e9'))
+        self.assertTrue(isinstance(dumped, Binary))
+        self.assertEqual(dumped.value, six.u('caf\u00e9').encode('utf-8'))
+
+    def test_dump_binary(self):
+        """ Values that are already Binary are dumped unchanged """
+        value = Binary(b'abc')
+        self.assertTrue(self.field.ddb_dump(value) is value)
+
+    def test_load_binary(self):
+        """ Binary values from Dynamo load as bytes """
+        loaded = self.field.ddb_load(Binary(b'abc'))
+        self.assertTrue(isinstance(loaded, six.binary_type))
+        self.assertEqual(loaded, b'abc')
+
+    def test_load_bytes(self):
+        """ Bytes from Dynamo load unchanged """
+        self.assertEqual(self.field.ddb_load(b'abc'), b'abc')
+
+    def test_round_trip(self):
+        """ Loading a dumped value gives back the coerced bytes """
+        for value in (b'abc', b'', b'\x00\xff', six.u('caf\u00e9'),
+                      Binary(b'abc')):
+            expected = value.value if isinstance(value, Binary) else \
+                self.field.coerce(value)
+            self.assertEqual(self.field.ddb_load(self.field.ddb_dump(value)),
+                             expected)
+
+
+DATES = [
+    date(2015, 5, 28),
+    date(1970, 1, 1),
+    date(1969, 12, 31),
+    date(1900, 1, 1),
+    date(1, 1, 1),
+    date(9999, 12, 31),
+]
+
+
+class TestDateType(unittest.TestCase):
+
+    """ Tests for converting dates to and from Dynamo """
+
+    def setUp(self):
+        super(TestDateType, self).setUp()
+        self.field = Field(data_type=date)
+
+    def test_dump(self):
+        """ Dates dump as the timestamp of midnight UTC """
+        for value in DATES:
+            self.assertEqual(self.field.ddb_dump(value),
+                             calendar.timegm(value.timetuple()))
+
+    def test_dump_datetime(self):
+        """ Datetimes dump the same as before """
+        value = datetime(2015, 5, 28, 15, 48, 9)
+        self.assertEqual(self.field.ddb_dump(value),
+                         calendar.timegm(value.timetuple()))
+
+    def test_round_trip(self):
+        """ Loading a dumped date gives back the same date """
+        for value in DATES:
+            dumped = self.field.ddb_dump(value)
+            self.assertEqual(self.field.ddb_load(dumped), value)
+            self.assertEqual(self.field.ddb_load(Decimal(dumped)), value)
+
+    def test_load_timestamp(self):
+        """ Timestamps within a day load as that day """
+        for value in ('1432828089', '1432828089.5', '-1', '-0.5', '-86400',
+                      '-86400.5', '0'):
+            timestamp = Decimal(value)
+            expected = datetime.utcfromtimestamp(float(timestamp)).date()
+            self.assertEqual(self.field.ddb_load(timestamp), expected)
+
+
 class TestFields(DynamoSystemTest):
 
     """ Tests for fields """
@@ -10,6 +10,7 @@ from dynamo3 import ItemUpdate
 from flywheel import (Field, Composite, Model, NUMBER, STRING, GlobalIndex,
                       ConditionalCheckFailedException)
 from flywheel.fields.types import UTC, register_type, TypeDefinition
+from flywheel.models import SetDelta
 from flywheel.tests import DynamoSystemTest
 try:
     import unittest2 as unittest  # pylint: disable=F0401
@@ -971,6 +972,14 @@ class Bare(Model):
     score = Field(range_key=True, data_type=int)
 
 
+class CustomDefault(Model):
+
+    """ Test model with a mutable default on an immutable data type """
+
+    id = Field(hash_key=True)
+    tags = Field(data_type=CustomDataType, default=[])
+
+
 class TestModelDefaults(unittest.TestCase):
 
     """ Test default model methods. """
@@ -993,6 +1002,24 @@ class TestModelDefaults(unittest.TestCase):
         self.assertEqual(m.id, 'a')
         self.assertEqual(m.score, 5)
 
+    def test_mutable_default_not_shared(self):
+        """ New models get their own copy of a mutable default """
+        m1 = CustomDefault('a')
+        m2 = CustomDefault('b')
+        self.assertEqual(m1.tags, [])
+        self.assertFalse(m1.tags is m2.tags)
+        m1.tags.append('foo')
+        self.assertEqual(m2.tags, [])
+
+    def test_post_load_on_create(self):
+        """ post_load_ is called when a model is created """
+        m = Loaded('a')
+        self.assertIsNone(m.loaded_with)
+        self.assertFalse(m.persisted_)
+        self.assertIsNone(m.__engine__)
+        self.assertEqual(m.__dirty__, set(['count', 'full']))
+        self.assertEqual(m.__cache__, {'tags': set(), 'data': None})
+
     def test_constructor_kwargs(self):
         """ Can set any parameter with constructor kwargs """
         m = Bare(foo='bar')
@@ -1044,6 +1071,363 @@ class TestModelDefaults(unittest.TestCase):
         self.assertNotEqual(m1, m2)
         self.assertNotEqual(hash(m1), hash(m2))
 
+    def test_equality_after_key_change(self):
+        """ Equality and hash follow changes to the primary key """
+        m1 = Bare('a', 1)
+        m2 = Bare('a', 1)
+        self.assertEqual(m1, m2)
+        self.assertEqual(hash(m1), hash(m2))
+        m2.id = 'b'
+        self.assertNotEqual(m1, m2)
+        self.assertNotEqual(hash(m1), hash(m2))
+        m2.id = 'a'
+        self.assertEqual(m1, m2)
+        self.assertEqual(hash(m1), hash(m2))
+
+    def test_persisted_key_cached(self):
+        """ Persisted models keep the same hash and equality """
+        m1 = Bare('a', 1)
+        m1.post_load_(None)
+        m2 = Bare('a', 1)
+        self.assertEqual(m1, m2)
+        self.assertEqual(hash(m1), hash(m2))
+        m1.id = 'a'
+        with self.assertRaises(AttributeError):
+            m1.id = 'b'
+        self.assertEqual(m1, m2)
+        self.assertEqual(hash(m1), hash(m2))
+
+
+class FullName(Model):
+
+    """ Test model with a default composite field """
+
+    id = Field(hash_key=True)
+    first = Field()
+    last = Field()
+    full = Composite('first', 'last')
+
+
+class ReversedName(FullName):
+
+    """ Subclass that overrides a composite field with another composite """
+
+    full = Composite('last', 'first')
+
+
+class PlainName(FullName):
+
+    """ Subclass that overrides a composite field with a plain field """
+
+    full = Field()
+
+
+class TestCompositeFields(unittest.TestCase):
+
+    """ Unit tests for resolving composite fields """
+
+    def test_read_on_instance(self):
+        """ Reading a composite field on a model resolves the value """
+        m = FullName('a', first='John', last='Smith')
+        self.assertEqual(m.full, 'John:Smith')
+        m.first = 'Jane'
+        self.assertEqual(m.full, 'Jane:Smith')
+        self.assertEqual(getattr(m, 'full'), 'Jane:Smith')
+
+    def test_read_on_class(self):
+        """ Reading a composite field on the class returns the field """
+        self.assertTrue(FullName.full is FullName.meta_.fields['full'])
+        self.assertTrue(isinstance(FullName.full, Composite))
+
+    def test_set_ignored(self):
+        """ Setting a composite field is ignored """
+        m = FullName('a', first='John', last='Smith')
+        dirty = set(m.__dirty__)
+        m.full = 'foo'
+        self.assertEqual(m.full, 'John:Smith')
+        self.assertFalse('full' in m.__dict__)
+        self.assertEqual(m.__dirty__, dirty)
+        del m.full
+        self.assertEqual(m.full, 'John:Smith')
+
+    def test_subclass_composite(self):
+        """ A subclass can override a composite with another composite """
+        m = ReversedName('a', first='John', last='Smith')
+        self.assertEqual(m.full, 'Smith:John')
+        self.assertTrue(ReversedName.full is
+                        ReversedName.meta_.fields['full'])
+
+    def test_subclass_plain_field(self):
+        """ A subclass can override a composite with a plain field """
+        m = PlainName('a', first='John', last='Smith', full='J. Smith')
+        self.assertEqual(m.full, 'J. Smith')
+        m.full = 'John S.'
+        self.assertEqual(m.full, 'John S.')
+        self.assertFalse(PlainName.meta_.fields['full'].composite)
+
+    def test_default_merge(self):
+        """ Composite fields join their subfields with ':' by default """
+        m = FullName('a', first='John', last='Smith')
+        self.assertEqual(m.full, 'John:Smith')
+
+    def test_replace_merge(self):
+        """ Replacing the merge function is used by later reads """
+        field = FullName.meta_.fields['full']
+        m = FullName('a', first='John', last='Smith')
+        m.post_load_(None)
+        merge = field.merge
+        field.merge = lambda first, last: last + ', ' + first
+        try:
+            self.assertEqual(m.full, 'Smith, John')
+            self.assertEqual(m.cached_('full'), 'Smith, John')
+        finally:
+            field.merge = merge
+        self.assertEqual(m.full, 'John:Smith')
+
+
+class IndexLater(Model):
+
+    """ Test model that gets a global index after it is created """
+
+    id = Field(hash_key=True)
+    foo = Field()
+
+
+class GlobalIndexLater(Model):
+
+    """ Test model that gets a second global index after it is created """
+
+    __metadata__ = {
+        'global_indexes': [
+            GlobalIndex('foo-index', 'foo'),
+        ],
+    }
+    id = Field(hash_key=True)
+    foo = Field()
+    bar = Field()
+    baz = Field(data_type=int)
+
+
+class TestAllGlobalIndexes(unittest.TestCase):
+
+    """ Tests for the set of fields used by global indexes """
+
+    def test_all_global_indexes(self):
+        """ Contains the keys of every global index """
+        self.assertEqual(Widget.meta_.all_global_indexes,
+                         set(['userid', 'ts']))
+
+    def test_set_all_global_indexes(self):
+        """ The set of global index keys can be assigned """
+        meta = GlobalIndexLater.meta_
+        original = meta.all_global_indexes
+        meta.all_global_indexes = set(['foo', 'bar'])
+        try:
+            self.assertEqual(meta.all_global_indexes, set(['foo', 'bar']))
+        finally:
+            meta.all_global_indexes = original
+        self.assertEqual(meta.all_global_indexes, set(['foo']))
+
+    def test_add_global_index(self):
+        """ Re-running post_create picks up new global indexes """
+        meta = GlobalIndexLater.meta_
+        self.assertEqual(meta.all_global_indexes, set(['foo']))
+        meta.global_indexes.append(GlobalIndex('bar-index', 'bar', 'baz'))
+        try:
+            meta.post_create()
+            self.assertEqual(meta.all_global_indexes,
+                             set(['foo', 'bar', 'baz']))
+        finally:
+            meta.global_indexes.pop()
+            meta.post_create()
+        self.assertEqual(meta.all_global_indexes, set(['foo']))
+
+
+class TestOrderingCache(unittest.TestCase):
+
+    """ Tests for looking up orderings from query fields """
+
+    def test_cached_ordering(self):
+        """ Repeated lookups return the same ordering """
+        meta = Widget.meta_
+        ordering = meta.get_ordering_from_fields(['userid'], ['ts'])
+        self.assertEqual(ordering.index_name, 'ts-index')
+        self.assertTrue(meta.get_ordering_from_fields(['userid'], ['ts'])
+                        is ordering)
+
+    def test_add_index_after_lookup(self):
+        """ Adding an index and re-running post_create updates lookups """
+        meta = IndexLater.meta_
+        self.assertIsNone(meta.get_ordering_from_fields(['foo'], []))
+        meta.global_indexes.append(GlobalIndex('foo-index', 'foo'))
+        meta.post_create()
+        meta.validate_model()
+        meta.post_validate()
+        ordering = meta.get_ordering_from_fields(['foo'], [])
+        self.assertEqual(ordering.index_name, 'foo-index')
+        self.assertTrue(meta.get_ordering_from_index('foo-index') is
+                        ordering)
+
+
+class Loaded(Model):
+
+    """ Test model for loading items from Dynamo """
+
+    id = Field(hash_key=True)
+    name = Field()
+    tags = Field(data_type=set)
+    count = Field(data_type=int, default=0)
+    data = Field(data_type=dict)
+    full = Composite('id', 'name', merge=lambda i, n: '%s:%s' % (i, n))
+
+    def post_load_(self, engine):
+        super(Loaded, self).post_load_(engine)
+        self.loaded_with = engine
+
+
+def set_ddb_vals(cls, engine, data):
+    """ Load a model by setting each value through __setattr__ """
+    obj = cls.__new__(cls)
+    with obj.loading_(engine):
+        for key, val in data.items():
+            obj.set_ddb_val_(key, val)
+    return obj
+
+
+class TestLoad(unittest.TestCase):
+
+    """ Tests for loading models from Dynamo data """
+
+    def assert_same_state(self, data):
+        """ ddb_load_ matches loading each value through __setattr__ """
+        engine = object()
+        obj = Loaded.ddb_load_(engine, data)
+        expected = set_ddb_vals(Loaded, engine, data)
+        for name in Loaded.meta_.fields:
+            self.assertEqual(getattr(obj, name), getattr(expected, name))
+        self.assertEqual(obj.__dirty__, expected.__dirty__)
+        self.assertEqual(obj.__cache__, expected.__cache__)
+        self.assertEqual(obj.__incrs__, expected.__incrs__)
+        self.assertTrue(obj.persisted_)
+        self.assertTrue(obj.__engine__ is engine)
+        self.assertTrue(obj.loaded_with is engine)
+        for name, value in obj.__cache__.items():
+            if value is not None:
+                self.assertFalse(value is getattr(obj, name))
+        return obj
+
+    def test_load_full(self):
+        """ Loading every field """
+        data = Loaded('a', name='b', tags=set(['x', 'y']), count=4,
+                      data={'c': 1}).ddb_dump_()
+        obj = self.assert_same_state(data)
+        self.assertEqual(obj.tags, set(['x', 'y']))
+        self.assertEqual(obj.full, 'a:b')
+
+    def test_load_missing(self):
+        """ Missing fields keep their defaults """
+        obj = self.assert_same_state({'id': 'a'})
+        self.assertIsNone(obj.name)
+        self.assertEqual(obj.tags, set())
+        self.assertEqual(obj.count, 0)
+        self.assertEqual(obj.__dirty__, set())
+
+    def test_load_extra(self):
+        """ Undeclared attributes are ignored """
+        obj = self.assert_same_state({'id': 'a', 'foo': 'bar'})
+        self.assertFalse('foo' in obj.__dict__)
+
+    def test_load_composite(self):
+        """ Stored composite values are resolved from their subfields """
+        obj = self.assert_same_state({'id': 'a', 'name': 'b',
+                                      'full': 'wrong'})
+        self.assertEqual(obj.full, 'a:b')
+
+    def test_load_set(self):
+        """ Loaded sets are tracked for in-place changes """
+        data = {'id': 'a', 'tags': set(['x'])}
+        obj = self.assert_same_state(data)
+        obj.tags.add('y')
+        self.assertEqual(obj.cached_('tags'), set(['x']))
+
+
+class TestSetDelta(unittest.TestCase):
+
+    """ Unit tests for merging set changes """
+
+    def test_add(self):
+        """ Added values are merged into the set """
+        delta = SetDelta()
+        delta.add('ADD', 'a')
+        delta.add('ADD', set(['b', 'c']))
+        self.assertEqual(delta.merge(set(['c', 'd'])),
+                         set(['a', 'b', 'c', 'd']))
+
+    def test_add_to_none(self):
+        """ Adding to a missing set creates it """
+        delta = SetDelta()
+        delta.add('ADD', 'a')
+        self.assertEqual(delta.merge(None), set(['a']))
+
+    def test_remove(self):
+        """ Removed values are taken out of the set """
+        delta = SetDelta()
+        delta.add('DELETE', set(['a', 'b']))
+        self.assertEqual(delta.merge(set(['a', 'b', 'c'])), set(['c']))
+
+    def test_merge_copies(self):
+        """ Merging never modifies the original set """
+        original = set(['a', 'b'])
+        delta = SetDelta()
+        delta.add('ADD', 'c')
+        merged = delta.merge(original)
+        self.assertEqual(original, set(['a', 'b']))
+        self.assertFalse(merged is original)
+        delta = SetDelta()
+        delta.add('DELETE', 'a')
+        merged = delta.merge(original)
+        self.assertEqual(original, set(['a', 'b']))
+        self.assertEqual(merged, set(['b']))
+
+    def test_add_then_remove(self):
+        """ Removing a value that was just added cancels it out """
+        delta = SetDelta()
+        delta.add('ADD', set(['a', 'b']))
+        delta.add('DELETE', 'a')
+        self.assertEqual(delta.action, 'ADD')
+        self.assertEqual(delta.merge(set(['c'])), set(['b', 'c']))
+
+    def test_remove_then_add(self):
+        """ Adding a value that was just removed cancels it out """
+        delta = SetDelta()
+        delta.add('DELETE', set(['a', 'b']))
+        delta.add('ADD', set(['a']))
+        self.assertEqual(delta.action, 'DELETE')
+        self.assertEqual(delta.merge(set(['a', 'b', 'c'])),
+                         set(['a', 'c']))
+
+    def test_add_and_remove_new(self):
+        """ Can't add and remove different values in one delta """
+        delta = SetDelta()
+        delta.add('ADD', 'a')
+        with self.assertRaises(ValueError):
+            delta.add('DELETE', 'b')
+
+    def test_remove_missing(self):
+        """ Merging a removal of values not in the set raises """
+        delta = SetDelta()
+        delta.add('DELETE', set(['a', 'b']))
+        with self.assertRaises(KeyError):
+            delta.merge(set(['a']))
+        with self.assertRaises(KeyError):
+            delta.merge(None)
+
+    def test_bad_action(self):
+        """ Only ADD and DELETE are valid actions """
+        delta = SetDelta()
+        with self.assertRaises(ValueError):
+            delta.add('REPLACE', 'a')
+
 
 class FloatModel(Model):
     """ Test model with floats in the primary key """
@@ -1,8 +1,15 @@
 """ Tests for engine queries """
 import six
+from mock import patch
 from flywheel import (Field, Composite, Model, NUMBER, STRING_SET, GlobalIndex,
                       DuplicateEntityException, EntityNotFoundException, Limit)
+from flywheel.fields import conditions
+from flywheel.fields.conditions import filter_key
 from flywheel.tests import DynamoSystemTest
+try:
+    import unittest2 as unittest  # pylint: disable=F0401
+except ImportError:
+    import unittest
 
 # pylint: disable=C0121
 
@@ -676,3 +683,49 @@ class TestEngine(DynamoSystemTest):
         """ engine.exists(hash_key, range_key) returns false if not found """
         w = Widget('a', 'Aaron')
         self.assertFalse(self.engine.exists(Widget, w))
+
+
+class TestFilterKey(unittest.TestCase):
+
+    """ Tests for building the dynamo3 filter keywords """
+
+    def test_filter_key(self):
+        """ Filter keys join the field and operator with '__' """
+        for field in ('id', 'name', six.u('score'), 'a__b'):
+            for op in ('eq', 'lt', 'beginswith', 'null'):
+                self.assertEqual(filter_key(field, op),
+                                 '%s__%s' % (field, op))
+
+    def test_cached(self):
+        """ Repeated lookups return the same string """
+        self.assertTrue(filter_key('id', 'eq') is filter_key('id', 'eq'))
+
+    @patch.object(conditions, '_MAX_FILTER_KEYS', 4)
+    def test_eviction(self):
+        """ The cache stays bounded and evicting doesn't change the keys """
+        keys = [('field%d' % i, op) for i in range(10)
+                for op in ('eq', 'gt')]
+        for _ in range(2):
+            for field, op in keys:
+                self.assertEqual(filter_key(field, op),
+                                 '%s__%s' % (field, op))
+                # pylint: disable=W0212
+                self.assertTrue(len(conditions._FILTER_KEYS) <= 4)
+
+
+class TestInFilter(unittest.TestCase):
+
+    """ Tests for building 'in' filters """
+
+    def test_in(self):
+        """ The 'in' filter dumps each value for Dynamo """
+        condition = User.score.in_([1, 2, 2])
+        self.assertEqual(condition.fields['score'], ('in', set([1, 2])))
+
+    def test_in_not_allowed(self):
+        """ The 'in' filter is not allowed on every data type """
+        field = Field(data_type=dict)
+        field.name = 'data'
+        with self.assertRaises(TypeError) as cm:
+            field.in_([{}])
+        self.assertTrue("'in' filter" in str(cm.exception))
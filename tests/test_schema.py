@@ -1,10 +1,16 @@
 """ Tests for schema changes. """
-from dynamo3 import Throughput
+from mock import MagicMock, Mock, call, patch
+from dynamo3 import DynamoDBConnection, Throughput
 from dynamo3.exception import DynamoDBError
 from dynamo3.fields import Table
-from flywheel import (Field, NUMBER, GlobalIndex)
+from flywheel import (Engine, Field, NUMBER, GlobalIndex)
+from flywheel.model_meta import wait_for_active
 from flywheel.models import Model
 from flywheel.tests import DynamoSystemTest
+try:
+    import unittest2 as unittest  # pylint: disable=F0401
+except ImportError:
+    import unittest
 
 
 # pylint: disable=C0121
@@ -52,6 +58,11 @@ class WidgetWithoutIndexes(Model):
         self.num = num
 
 
+class Waiting(Model):
+    """ Model for testing waiting on table creation """
+    id = Field(hash_key=True)
+
+
 class TestAddIndex(DynamoSystemTest):
     """ Tests index updates. """
     dynamo = None
@@ -262,3 +273,70 @@ class TestAddIndex(DynamoSystemTest):
         self.assertEqual(changed, WidgetToAddIndex.meta_.ddb_tablename())
 
         self.assertListEqual(mock_connection.table_list, [])
+
+
+def table_statuses(statuses):
+    """ Make a describe_table that walks each table through statuses """
+    calls = {}
+
+    def describe_table(tablename):
+        """ Return the next status for the table """
+        count = calls.get(tablename, 0)
+        calls[tablename] = count + 1
+        return Mock(status=statuses[min(count, len(statuses) - 1)])
+    return describe_table
+
+
+@patch('flywheel.model_meta.time.sleep')
+class TestWaitForActive(unittest.TestCase):
+
+    """ Tests for waiting on tables to become active """
+
+    def test_already_active(self, sleep):
+        """ Don't sleep if the table is already active """
+        connection = MagicMock()
+        connection.describe_table.side_effect = table_statuses(['ACTIVE'])
+        wait_for_active(connection, 'foo')
+        connection.describe_table.assert_called_once_with('foo')
+        self.assertFalse(sleep.called)
+
+    def test_backoff(self, sleep):
+        """ Poll with exponential backoff up to a maximum delay """
+        connection = MagicMock()
+        connection.describe_table.side_effect = table_statuses(
+            ['CREATING'] * 8 + ['ACTIVE'])
+        wait_for_active(connection, 'foo')
+        self.assertEqual(connection.describe_table.call_count, 9)
+        self.assertEqual(sleep.call_args_list,
+                         [call(0.2), call(0.4), call(0.8), call(1.6),
+                          call(3.2), call(5), call(5), call(5)])
+
+    def test_create_schema(self, sleep):
+        """ create_schema requests every table before waiting on any """
+        connection = MagicMock(spec=DynamoDBConnection)
+        connection.list_tables.return_value = ['test-WidgetWithoutIndexes']
+        connection.describe_table.side_effect = table_statuses(
+            ['CREATING', 'ACTIVE'])
+        engine = Engine(connection, ['test'])
+        engine.register(WidgetToAddIndex, WidgetWithoutIndexes, Waiting)
+        changed = engine.create_schema()
+        self.assertEqual(sorted(changed),
+                         ['test-Waiting', 'test-WidgetToAddIndex'])
+        methods = [name for name, _, _ in connection.mock_calls]
+        self.assertEqual(methods[:3], ['list_tables', 'create_table',
+                                       'create_table'])
+        self.assertEqual(sorted(methods[3:]), ['describe_table'] * 4)
+        self.assertEqual(sleep.call_args_list, [call(0.2), call(0.2)])
+
+    def test_create_schema_test(self, sleep):
+        """ A dry run doesn't create or wait on any tables """
+        connection = MagicMock(spec=DynamoDBConnection)
+        connection.list_tables.return_value = []
+        engine = Engine(connection, ['test'])
+        engine.register(WidgetWithoutIndexes, Waiting)
+        changed = engine.create_schema(test=True)
+        self.assertEqual(sorted(changed),
+                         ['test-Waiting', 'test-WidgetWithoutIndexes'])
+        self.assertFalse(connection.create_table.called)
+        self.assertFalse(connection.describe_table.called)
+        self.assertFalse(sleep.called)